@@ -1,38 +1,59 @@
+from pathlib import Path
+
 from main import predict_data
 
-def baseline_difficult_cases(difficult_cases_path: str):
-    """Classifies utterances in `difficult_cases_path` using both baseline models.
-    
+def load_difficult_cases(difficult_cases_path: str) -> tuple:
+    """Reads labels and utterances from `difficult_cases_path`.
+
     Inputs:
-        difficult_cases_path: Path to file with utterances to be classified. 
-    
+        difficult_cases_path: Path to file with utterances to be classified.
+
+    Returns:
+        diff_case_labels: List of dialog act labels in the file.
+        diff_case_sentences: List of lowercased utterances in the file.
+    """
+    # Read and lowercase the whole file at once, then prepare and split every non-empty line
+    lines = Path(difficult_cases_path).read_text(encoding="utf-8").lower().splitlines()
+    diff_case_prepped_lines = [line.strip().split(" ", maxsplit=1) for line in lines if line.strip()]
+
+    if not diff_case_prepped_lines:
+        return [], []
+
+    diff_case_labels, diff_case_sentences = map(list, zip(*diff_case_prepped_lines))
+    return diff_case_labels, diff_case_sentences
+
+def baseline_difficult_cases(*difficult_cases_paths: str):
+    """Classifies utterances in all `difficult_cases_paths` using both baseline models.
+
+    All files are classified in one batch, the results are printed per file.
+
+    Inputs:
+        difficult_cases_paths: Paths to files with utterances to be classified.
+
     Returns:
         None: prints results of callification from both baseline models.
     """
-    diff_case_labels = []
-    diff_case_sentences = []
-
-    # Read, prepare and split file content
-    with open(difficult_cases_path) as file:
-        for line in file:
-            diff_case_prepped_line = line.strip().lower().split(" ", maxsplit=1)
-            diff_case_labels.append(diff_case_prepped_line[0])
-            diff_case_sentences.append(diff_case_prepped_line[1])
-
-    # Classify utterances using both baseline models
-    pred_diff_case_baseInf, pred_diff_case_baseRule = predict_data(diff_case_sentences)
-
-    # Print out results
-    print(f"Results for '{difficult_cases_path}' with baseline Inform:")
-    for pred_item in enumerate(pred_diff_case_baseInf):
-        print(pred_item)
-
-    print(f"\nResults for '{difficult_cases_path}' with baseline RuleBased:")
-    for pred_item in enumerate(pred_diff_case_baseRule):
-        print(pred_item)
-    
-    print("\n"+"-"*150)
+    all_sentences = []
+    file_bounds = []
+
+    # Read every file and remember which slice of the batch belongs to it
+    for difficult_cases_path in difficult_cases_paths:
+        _, diff_case_sentences = load_difficult_cases(difficult_cases_path)
+        file_bounds.append((difficult_cases_path, len(all_sentences), len(all_sentences) + len(diff_case_sentences)))
+        all_sentences.extend(diff_case_sentences)
+
+    # Classify utterances of all files at once using both baseline models
+    pred_baseInf, pred_baseRule = predict_data(all_sentences)
+
+    for difficult_cases_path, start, end in file_bounds:
+        # Print out results
+        print(f"Results for '{difficult_cases_path}' with baseline Inform:")
+        print("\n".join(str(pred_item) for pred_item in enumerate(pred_baseInf[start:end].tolist())))
+
+        print(f"\nResults for '{difficult_cases_path}' with baseline RuleBased:")
+        print("\n".join(str(pred_item) for pred_item in enumerate(pred_baseRule[start:end].tolist())))
+
+        print("\n"+"-"*150)
 
 # Run classification for both difficult cases files
-baseline_difficult_cases("./datasets/difficult_cases_multiple.dat")
-baseline_difficult_cases("./datasets/difficult_cases_negation.dat")
\ No newline at end of file
+baseline_difficult_cases("./datasets/difficult_cases_multiple.dat", "./datasets/difficult_cases_negation.dat")
@@ -3,4 +3,4 @@ class BaselineInform:
         """
         Predict the given data using the classification algorithm.
         """
-        return ['inform' for _ in range(len(data))]
+        return ['inform'] * len(data)
@@ -19,6 +19,15 @@ class BaselineRuleBased:
         self.restart = ['reset', 'start']
         self.thankyou = ['thank']
 
+        # Dialog acts in order of priority, used when keywords of multiple dialog acts are present
+        self.priority_order = ('inform', 'request', 'thankyou', 'reqalts', 'null', 'affirm', 'negate', 'bye', 'confirm', 'hello', 'repeat', 'ack', 'deny', 'restart', 'reqmore')
+
+        # Map every keyword to the priority of its dialog act, so an utterance is scanned only once
+        self.keyword_priority = {}
+        for priority, dialog_act in enumerate(self.priority_order):
+            for keyword in getattr(self, dialog_act):
+                self.keyword_priority.setdefault(keyword, priority)
+
     def predict(self, data: list) -> list:
         """Predict dialog act based on presence of keywords in utterance.
 
@@ -30,57 +39,12 @@ class BaselineRuleBased:
         predicted_results = []
 
         for utterance in data:
-            # Convert utterance to list of words
-            words_list = utterance.split(" ")
+            # Look up the priority of every keyword in the utterance and keep the highest one
+            priorities = [self.keyword_priority[word] for word in utterance.split(" ") if word in self.keyword_priority]
 
-            # Check for presence of keywords in utterance for every dialog act
-            ack_res = any(elem in words_list for elem in self.ack)
-            affirm_res = any(elem in words_list for elem in self.affirm)
-            bye_res = any(elem in words_list for elem in self.bye)
-            confirm_res = any(elem in words_list for elem in self.confirm)
-            deny_res = any(elem in words_list for elem in self.deny)
-            hello_res = any(elem in words_list for elem in self.hello)
-            inform_res = any(elem in words_list for elem in self.inform)
-            negate_res = any(elem in words_list for elem in self.negate)
-            null_res = any(elem in words_list for elem in self.null)
-            repeat_res = any(elem in words_list for elem in self.repeat)
-            reqalts_res = any(elem in words_list for elem in self.reqalts)
-            reqmore_res = any(elem in words_list for elem in self.reqmore)
-            request_res = any(elem in words_list for elem in self.request)
-            restart_res = any(elem in words_list for elem in self.restart)
-            thankyou_res = any(elem in words_list for elem in self.thankyou)
-
-            # Assign dialog act based on presence of keywords, in order of priority
-            if inform_res:
-                predicted_results.append("inform")
-            elif request_res:
-                predicted_results.append("request")    
-            elif thankyou_res:
-                predicted_results.append("thankyou")
-            elif reqalts_res:
-                predicted_results.append("reqalts")
-            elif null_res:
-                predicted_results.append("null")
-            elif affirm_res:
-                predicted_results.append("affirm")
-            elif negate_res:
-                predicted_results.append("negate")
-            elif bye_res:
-                predicted_results.append("bye")
-            elif confirm_res:
-                predicted_results.append("confirm")
-            elif hello_res:
-                predicted_results.append("hello")
-            elif repeat_res:
-                predicted_results.append("repeat")
-            elif ack_res:
-                predicted_results.append("ack")
-            elif deny_res:
-                predicted_results.append("deny")
-            elif restart_res:
-                predicted_results.append("restart")
-            elif reqmore_res:
-                predicted_results.append("reqmore")
+            # Fall back to 'inform' when no keyword is present
+            if priorities:
+                predicted_results.append(self.priority_order[min(priorities)])
             else:
                 predicted_results.append("inform")
                    
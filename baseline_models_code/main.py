@@ -1,11 +1,35 @@
-# Import libraries
-import pandas as pd
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-
 # Import models
 from baseline_models_code.baseline_inform import BaselineInform
 from baseline_models_code.baseline_rulebased import BaselineRuleBased
 
+# Shared model instances so repeated predictions don't rebuild the keyword tables
+_BASE_INFORM = BaselineInform()
+_BASE_RULE = BaselineRuleBased()
+
+# All dialog act labels, in the order they are shown in the metrics
+LABELS = ('ack', 'affirm', 'bye', 'confirm', 'deny', 'hello', 'inform', 'negate', 'null', 'repeat', 'reqalts', 'reqmore', 'request', 'restart', 'thankyou')
+
+def format_confusion_matrix(cm, labels: tuple) -> str:
+    """Format confusion matrix 'cm' as a text table with 'labels' as row and column names.
+
+    Inputs:
+        cm: Square matrix of counts, rows are true labels and columns are predicted labels.
+        labels: Names of the labels in the order of the rows and columns of 'cm'.
+    Returns:
+        Table as a string, laid out the same way as pandas prints a DataFrame.
+    """
+    cells = [[str(count) for count in row] for row in cm]
+
+    # every column is as wide as its label or its widest count
+    index_width = max(map(len, labels))
+    col_widths = [max([len(label)] + [len(row[j]) for row in cells]) for j, label in enumerate(labels)]
+
+    lines = [" " * index_width + "".join("  " + label.rjust(width) for label, width in zip(labels, col_widths))]
+    for label, row in zip(labels, cells):
+        lines.append(label.ljust(index_width) + "".join("  " + cell.rjust(width) for cell, width in zip(row, col_widths)))
+
+    return "\n".join(lines)
+
 def calc_metrics(model_name: str, y_true: list, y_pred: list):
     """Calculate accuracy, precision, recall, f1-score and show a confusion matrix based on 'y_true' and 'y_pred'
 
@@ -16,6 +40,9 @@ def calc_metrics(model_name: str, y_true: list, y_pred: list):
     Returns:
         None: prints out metrics to terminal.
     """
+    # Only metric calculation needs sklearn, so import it here to keep start-up fast
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+
     # a line to seperate metrics of different models
     print("\n"+"-"*150)
     
@@ -24,20 +51,16 @@ def calc_metrics(model_name: str, y_true: list, y_pred: list):
     # calculate and print accuracy
     print("\nAccuracy:", accuracy_score(y_true, y_pred))
 
-    labels = ['ack', 'affirm', 'bye', 'confirm', 'deny', 'hello', 'inform', 'negate', 'null', 'repeat', 'reqalts', 'reqmore', 'request', 'restart', 'thankyou']
-
     # calculate and print precision, recall and f1-score
     print(
         "\nClassification Report:\n",
-        classification_report(y_true, y_pred, labels=labels, zero_division=0),
+        classification_report(y_true, y_pred, labels=LABELS, zero_division=0),
     )
 
     # calculate and print confusion matrix
-    cm = confusion_matrix(y_true, y_pred, labels=labels)
-    df_cm = pd.DataFrame(cm, index=labels, columns=labels)
+    cm = confusion_matrix(y_true, y_pred, labels=LABELS)
     print("Confusion Matrix (counts)")
-    with pd.option_context('display.max_columns', None, 'display.width', 200):
-        print(df_cm.to_string())
+    print(format_confusion_matrix(cm, LABELS))
 
 def predict_data(x_test: list) -> tuple:
     """Predicts class for data in 'x_test' using the Baseline Inform and Baseline Rule Based models.
@@ -46,28 +69,32 @@ def predict_data(x_test: list) -> tuple:
         x_test: List of utterances to be classified.
     
     Returns:
-        baseInform_res: List of predicted labels from Baseline Inform model.
-        baseRuleBased_res: List of predicted labels from Baseline Rule Based model.
+        baseInform_res: Array of predicted labels from Baseline Inform model.
+        baseRuleBased_res: Array of predicted labels from Baseline Rule Based model.
     """
+    # numpy is only needed for batch predictions, so import it here to keep start-up fast
+    import numpy as np
+
+    # Classify every distinct utterance only once, then scatter the predictions back to all duplicates
+    unique_index = {}
+    inverse = np.fromiter((unique_index.setdefault(utterance, len(unique_index)) for utterance in x_test), dtype=np.intp, count=len(x_test))
+    unique_x_test = list(unique_index)
+
     # predictions based on Baseline Inform
-    baseInform = BaselineInform()
-    baseInform_res = baseInform.predict(x_test)
+    baseInform_res = np.asarray(_BASE_INFORM.predict(unique_x_test), dtype=str)[inverse]
 
     # predictions based on Baseline Rule Based
-    baseRuleBased = BaselineRuleBased()
-    baseRuleBased_res = baseRuleBased.predict(x_test)
+    baseRuleBased_res = np.asarray(_BASE_RULE.predict(unique_x_test), dtype=str)[inverse]
     return baseInform_res, baseRuleBased_res
 
-def test_rule_based(utterance: str) -> str:
-    """Predicts class of 'utterance' based on Baseline Rule Based model.
+def classify_many(utterances: list) -> list:
+    """Predicts classes of all 'utterances' in one batch using the Baseline Rule Based model.
 
     Inputs:
-        utterance: Utterance to be classified.
+        utterances: List of utterances to be classified.
     
     Returns:
-        Predicted label from Baseline Rule Based model.
+        List of predicted labels from Baseline Rule Based model, in the same order as 'utterances'.
     """
-    baseRuleBased = BaselineRuleBased()
-    baseRuleBased_res = baseRuleBased.predict([utterance])
-    return baseRuleBased_res[0]
+    return _BASE_RULE.predict(list(utterances))
 
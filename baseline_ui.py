@@ -1,6 +1,26 @@
-from baseline_models_code.main import predict_data, calc_metrics, test_rule_based
+from baseline_models_code.main import predict_data, calc_metrics, classify_many
 from preprocess_dataset import load_data_to_df, stratified_split
 
+# Number of buffered utterances after which the 'try me' loop classifies automatically
+MAX_PENDING_UTTERANCES = 32
+
+# Commands accepted by the start-up menu
+VALID_COMMANDS = frozenset({'file', 'try me', 'exit'})
+
+def print_predictions(utterances: list):
+    """Classify `utterances` as one batch and print the prediction for each of them.
+
+    Inputs:
+        utterances: List of utterances to be classified.
+    Returns:
+        None: prints the predicted dialog act for every utterance.
+    """
+    if not utterances:
+        return
+
+    for utterance, prediction in zip(utterances, classify_many(utterances)):
+        print(f"The predicted dialog act for '{utterance}' is: {prediction}")
+
 def start_up_ui(x_test: list, y_test: list):
     """Function to run terminal UI
 
@@ -20,8 +40,8 @@ def start_up_ui(x_test: list, y_test: list):
     # User input choice
     user_input = input("What is it going to be?: ")
 
-    # Input validation
-    if user_input not in ['file', 'try me', 'exit']:
+    # Input validation, keep asking until a valid command is given
+    while user_input not in VALID_COMMANDS:
         print('You entered in an incorrect input, try again!')
         user_input = input("What is it going to be?: ")
     
@@ -39,20 +59,31 @@ def start_up_ui(x_test: list, y_test: list):
     # Run predictions on user input utterance
     elif user_input == 'try me':
         print('You want to test my skills!')
+        print("Enter your utterances one per line, an empty line classifies them all at once.")
+
+        # Buffer utterances so the rule-based model classifies them in one batch
+        pending = []
 
         # Loop until user wants to exit
         while True:
             # User input utterance
-            input_utterance = input("Enter an utterance to classify (or type 'exit' to quit): ").lower().strip()
+            input_utterance = input("Enter an utterance to classify (or type 'exit' to quit): ").strip().lower()
             
             # Exit loop if user types 'exit'
-            if input_utterance.lower() == 'exit':
+            if input_utterance == 'exit':
+                print_predictions(pending)
                 print("Exiting the program.")
                 break
-                
-            # Get prediction from rule-based model
-            input_prediction = test_rule_based(input_utterance)
-            print(f"The predicted dialog act is: {input_prediction}")
+
+            # Keep collecting until an empty line or the buffer is full
+            if input_utterance:
+                pending.append(input_utterance)
+                if len(pending) < MAX_PENDING_UTTERANCES:
+                    continue
+
+            # Get predictions from rule-based model
+            print_predictions(pending)
+            pending = []
 
     # Exit the program
     else:
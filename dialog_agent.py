@@ -1,67 +1,243 @@
+import csv
+import dataclasses
+import functools
 import json
 import random
-import pandas as pd
+import re
+import sys
+from collections import defaultdict, deque
 from pathlib import Path
-from infer import infer_utterance, load_artifacts
+from infer import infer_batch, infer_utterance, load_artifacts
 from keyword_extractor import extract_keywords
-from expand_csv import expand_csv
 
 # Shared greeting reused for both the initial turn and any restart.
 WELCOME_MESSAGE = "Hello , welcome to the Cambridge restaurant system? You can ask for restaurants by area , price range or food type . How may I help you?"
 WELCOME_MESSAGE_INFORMAL = "Eyoo, What's up? I'm gonna help you pick a restaurant to eat. Just tell me the area, price range and what type of food you like."
 
+# Response templates per register, indexed by message key and filled in with str.format where needed.
+FORMAL_MSGS = {
+    "welcome": WELCOME_MESSAGE,
+    "ask_area": "What part of town do you have in mind?",
+    "ask_price": "How pricey would you like the restaurant to be?",
+    "ask_food": "What kind of food would you like?",
+    "no_match": "There are no restaurants that meet your requirements. Would you like to change the area, pricerange or foodtype? And what would you like to change it to?",
+    "only_match": "{name} is the only restaurant that meet your requirements. {reasoning} What information would you like on this restaurant - phone, address or postcode?",
+    "match": "{name} is a restaurant that meet your requirements. {reasoning} What information would you like on this restaurant - phone, address or postcode or an alternative restaurant?",
+    "alternative": "{name} is {other} restaurant that meet your requirements. {reasoning} What information would you like on this restaurant - phone, address or postcode or a different restaurant?",
+    "no_alternative": "There are no other restaurant left that meet your requirements. Would you like some infromation about the last suggested restaurant?",
+    "phone": "The phone number of restaurant {name} is {phone}",
+    "addr": "The address of {name} is {addr}",
+    "postcode": "The postcode of {name} is {postcode}",
+    "details": "The detail information of {name} are phone number: '{phone}', address: '{addr}' and postcode: '{postcode}'",
+    "last_statement": "Restaurant {name} is an outstanding restaurant.",
+    "not_understood": "I didn't understand, could you rephrase it in a different way?",
+}
+INFORMAL_MSGS = {
+    "welcome": WELCOME_MESSAGE_INFORMAL,
+    "ask_area": "Where about in town do you wanna eat?",
+    "ask_price": "How pricey do you want your meal to be?",
+    "ask_food": "What kind of food are you in the mood for?",
+    "no_match": "Sorry man, no restaurants meet your preference. Please try a different area, price range or food type.",
+    "only_match": "{name} is the only match. {reasoning} What info would you like on this restaurant - phone, address or postcode?",
+    "match": "{name} is just what you are looking for. {reasoning} What info would you like on this restaurant - phone, address or postcode or an alternative restaurant?",
+    "alternative": "{name} is {other} match. {reasoning} What info would you like on this restaurant - phone, address or postcode or a different restaurant?",
+    "no_alternative": "Sorry man no restaurants are left with your requirements, do you want to know something about the last restaurant I suggested.",
+    "phone": "You can call {name} with {phone}",
+    "addr": "{name} is on {addr}",
+    "postcode": "You can find {name} over here {postcode}",
+    "details": "Here you have some information about {name}, phone number: '{phone}', address: '{addr}' and postcode: '{postcode}'",
+    "last_statement": "Restaurant {name} is great! You will love it!",
+    "not_understood": "Sorry man, didn't get that can you rephrase it?",
+}
+
+# Keyword fallbacks for restart requests and yes/no answers, built once instead of every turn.
+_RESTART_RE = re.compile(r"\b(?:restart|start over|start again|reset)\b")
+# Keywords for the restaurant information the user can ask for, matched anywhere in the utterance.
+_PHONE_RE = re.compile(r"phone|phonenumber|telephone|number")
+_ADDRESS_RE = re.compile(r"address|adress|street")
+_POSTCODE_RE = re.compile(r"postal|postcode|zip|post|code")
+
+def _answer_regex(answers: frozenset) -> re.Pattern:
+    """Build the regex matching longer answers that start with one of `answers`.
+
+    Inputs:
+        answers: Answers that are a plain yes or no on their own.
+    Returns:
+        Compiled regex for `re.match`, single word answers match as the first word, multi word answers only as the whole answer.
+    """
+    words = "|".join(re.escape(answer) for answer in sorted(answers) if " " not in answer)
+    phrases = "|".join(re.escape(answer) for answer in sorted(answers) if " " in answer)
+    pattern = rf"(?:{words})(?:\s|$)"
+    if phrases:
+        pattern += rf"|(?:{phrases})$"
+    return re.compile(pattern)
+
+# Answers that are a plain yes/no on their own, the only place the yes/no vocabulary is listed.
+_YES_ANSWERS = frozenset({"yes", "yeah", "yep", "sure", "correct", "absolutely", "affirmative", "right"})
+_NO_ANSWERS = frozenset({"no", "nope", "nah", "negative", "not really", "don't"})
+# Longer yes/no answers like "yes please" or "no thanks", built from the same answers.
+_YES_RE = _answer_regex(_YES_ANSWERS)
+_NO_RE = _answer_regex(_NO_ANSWERS)
+_CONFIRM_INTENTS = frozenset({"confirm", "affirm"})
+_DENY_INTENTS = frozenset({"deny", "negate"})
+_YES_NO_INTENTS = _CONFIRM_INTENTS | _DENY_INTENTS
+
+# Common short answers classified when an agent is created, so the first turns using them are cache hits.
+_PREWARM_UTTERANCES = tuple(sorted(_YES_ANSWERS | _NO_ANSWERS)) + ("phone", "address", "postcode", "another", "thank you", "bye", "restart")
+
+# Dialog act and state groups used for membership tests on every turn.
+_PREFERENCE_STATES = frozenset({"1. Welcome", "4.2 Ask Area", "5.2 Ask Price", "6.2 Ask Food type"})
+_SLOT_FILLING_INTENTS = frozenset({"request", "reqalts"})
+_ACCEPT_INTENTS = frozenset({"confirm", "affirm", "null"})
+_GOODBYE_INTENTS = frozenset({"bye", "thankyou"})
+# States after a restaurant was suggested, preferences given here are never used for a new look up.
+_SUGGESTION_STATES = frozenset({"10.1 Suggest restaurant", "11.1 Provide information questioned", "12.1 Last restaurant statement"})
+
+# Order the preferences are asked in, unless they are asked in random order.
+_PREFERENCE_ORDER = ("4.2 Ask Area", "5.2 Ask Price", "6.2 Ask Food type")
+
+# Number of most recent states kept in the state history.
+STATE_HISTORY_SIZE = 128
+
+# Restaurant columns the agent reads, the experience columns only exist in the expanded files.
+_RESTAURANT_COLUMNS = frozenset({"restaurantname", "pricerange", "area", "food", "phone", "addr", "postcode", "food_quality", "crowdedness", "length_of_stay"})
+
+@dataclasses.dataclass(slots=True)
+class _PendingPreference:
+    """Preference captured from the user that still has to be confirmed with a yes/no."""
+    slot: str       # attribute the value is stored in once confirmed
+    value: str      # proposed value, 'dontcare' when the user has no preference
+    ask_state: str  # state to fall back to when the user says "no"
+    prompt: str     # question of that state, asked again after a "no"
+
+    @property
+    def message(self) -> str:
+        """Confirmation question asked for this preference."""
+        chosen_value = "don't care" if self.value == "dontcare" else self.value
+        return f"You chose {self.slot} {chosen_value}. Is that correct?"
+
+@functools.lru_cache(maxsize=None)
+def _load_config() -> dict:
+    """Read the behaviour toggles from `config.json` once and reuse them for every agent.
+
+    Inputs:
+        None; reads `config.json` from the current working directory.
+    Returns:
+        Dictionary with the parsed config, or an empty dict when the file is missing or invalid.
+    """
+    config_path = Path("config.json")
+    if not config_path.exists():
+        return {}
+
+    try:
+        with config_path.open("r", encoding="utf-8") as config_file:
+            return json.load(config_file)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+@functools.lru_cache(maxsize=8)
+def _load_model(model_path: str) -> tuple:
+    """Load the model artifacts once per directory, so every agent created in this process shares them.
+
+    Inputs:
+        model_path: Directory containing the saved model artifacts.
+    Returns:
+        Tuple of (model, vectorizer, label_encoder, metadata dict), see `infer.load_artifacts`.
+    """
+    return load_artifacts(Path(model_path))
+
+@functools.lru_cache(maxsize=4096)
+def _classify_utterance(model_path: str, utterance: str) -> str:
+    """Classify the dialog act of `utterance`, cached per model so all agents in this process share the results.
+
+    Inputs:
+        model_path: Directory containing the saved model artifacts.
+        utterance: Normalized user utterance.
+    Returns:
+        Predicted dialog act label.
+    """
+    model, vectorizer, label_encoder, metadata = _load_model(model_path)
+    return infer_utterance(model, vectorizer, label_encoder, metadata, utterance)
+
 class dialogAgent():
+    # Fixed set of instance attributes, avoids a per-instance __dict__ and speeds up attribute access
+    __slots__ = (
+        "model", "vectorizer", "label_encoder", "metadata", "_classify",
+        "restaurant_info_path", "_restaurant_index",
+        "area", "price", "food", "state_history", "restaurants", "sugg_restaurant", "debug_mode",
+        "confirm_preferences", "allow_restart", "random_order", "_msg",
+        "pending", "pending_queue",
+        "romantic", "children", "assigned_seats", "touristic",
+        "prefference_order", "_state_handlers", "_act_handlers",
+    )
+
+    # Preference slots as (keyword extractor key, attribute, state asking for it, message key of the question of that state)
+    _SLOTS = (
+        ("area", "area", "4.2 Ask Area", "ask_area"),
+        ("pricerange", "price", "5.2 Ask Price", "ask_price"),
+        ("food", "food", "6.2 Ask Food type", "ask_food"),
+    )
+
+    # Ask states with the preference they ask for and the message key of their question
+    _ASK_STATES = {
+        "4.2 Ask Area": ("area", "ask_area"),
+        "5.2 Ask Price": ("price", "ask_price"),
+        "6.2 Ask Food type": ("food", "ask_food"),
+    }
+
     def __init__(self, model_path=None, restaurant_path="datasets/restaurant_info.csv", debug_mode=False):
         """
         Initialize dialog agent
         """
         # Load in ML model or train ML model (based on input)
-        self.model, self.vectorizer, self.label_encoder, self.metadata = load_artifacts(Path(model_path))
+        self.model, self.vectorizer, self.label_encoder, self.metadata = _load_model(str(model_path))
+
+        # The model never changes, so repeated utterances (yes, no, phone, ...) reuse their dialog act, also across agents
+        self._classify = functools.partial(_classify_utterance, str(model_path))
+        for prewarm_utterance in _PREWARM_UTTERANCES:
+            self._classify(prewarm_utterance)
 
         # Save path to restaurant info file
         self.restaurant_info_path = restaurant_path
-        if Path(restaurant_path.replace('restaurant_info', 'expanded_lab2_restaurant_info')).exists():
+        lab2_path = restaurant_path.replace('restaurant_info', 'expanded_lab2_restaurant_info')
+        expanded_path = restaurant_path.replace('restaurant_info', 'expanded_restaurant_info')
+        if Path(lab2_path).exists():
             # for lab 2, for the user to have a choice between 7 food, 5 areas and 3 price ranges, and all of them to return a restaurant, we need to add some dummy restaurants
-            self.restaurant_info_path = restaurant_path.replace('restaurant_info', 'expanded_lab2_restaurant_info')
-        elif Path(restaurant_path.replace('restaurant_info', 'expanded_restaurant_info')).exists():
+            self.restaurant_info_path = lab2_path
+        elif Path(expanded_path).exists():
             # If the expanded file exists, use that one instead
-            self.restaurant_info_path = restaurant_path.replace('restaurant_info', 'expanded_restaurant_info')
+            self.restaurant_info_path = expanded_path
+
+        # Load restaurant info once, so look ups don't re-read the file every turn
+        with open(self.restaurant_info_path, newline='', encoding='utf-8') as csvfile:
+            restaurant_records = [
+                {column: value for column, value in row.items() if column in _RESTAURANT_COLUMNS}
+                for row in csv.DictReader(csvfile)
+            ]
+        self._restaurant_index = self.__build_restaurant_index(restaurant_records)
         
         # Load configuration toggles so behaviour can be switched without code changes.
-        config_path = Path("config.json")
         confirm_key = "Ask confirmation for each preference or not"
         restart_key = "Allow dialog restarts or not"
         informal_key = "Informal language instead of formal"
         random_key = "Preferences are asked in random order"
-        confirm_flag = False
-        restart_flag = False
-        informal_flag = False
-        random_flag = False
-
-        if config_path.exists():
-            try:
-                with config_path.open("r", encoding="utf-8") as config_file:
-                    config_data = json.load(config_file)
-                    confirm_flag = config_data.get(confirm_key, False)
-                    restart_flag = config_data.get(restart_key, False)
-                    informal_flag = config_data.get(informal_key, False)
-                    random_flag = config_data.get(random_key, False)
-            except (json.JSONDecodeError, OSError):
-                confirm_flag = False
-                restart_flag = False
-                informal_flag = False
-                random_flag = False
+
+        config_data = _load_config()
+        confirm_flag = config_data.get(confirm_key, False)
+        restart_flag = config_data.get(restart_key, False)
+        informal_flag = config_data.get(informal_key, False)
+        random_flag = config_data.get(random_key, False)
 
         # Initialize important variables
         self.area = None
         self.price = None
         self.food = None
 
-        # Initialize state history
-        self.state_history = []
+        # Initialize state history, bounded so long sessions don't keep growing it
+        self.state_history = deque(maxlen=STATE_HISTORY_SIZE)
 
         # Restaurants that met requirements
-        self.restaurants = []
+        self.restaurants = deque()
 
         # Last suggested restaurant
         self.sugg_restaurant = None
@@ -76,16 +252,9 @@ class dialogAgent():
         self.random_order = random_flag
 
         # The following fields track whichever slot/value is being confirmed:
-        # - pending_slot/pending_value store the slot name and proposed value currently awaiting yes/no.
-        # - pending_state/pending_prompt let us fall back to the original question if the user says "no".
-        # - pending_message is the confirmation prompt we just asked.
+        # - pending is the _PendingPreference currently awaiting yes/no, None when nothing is being confirmed.
         # - pending_queue holds any additional slot updates captured in the same utterance so we can confirm them sequentially.
-        self.pending_slot = None
-        self.pending_value = None
-        self.pending_state = None
-        self.pending_prompt = None
-        self.pending_message = None
-        self.pending_queue = []
+        self.pending = None
         self.pending_queue = []
 
         # Initialize additional preferences
@@ -95,7 +264,30 @@ class dialogAgent():
         self.touristic = None
 
         # Prefferences order
-        self.prefference_order = ["4.2 Ask Area", "5.2 Ask Price", "6.2 Ask Food type"] 
+        self.prefference_order = list(_PREFERENCE_ORDER)
+
+        # State transition handlers, looked up by the current state
+        self._state_handlers = {
+            None: self.__handle_start,
+            "1. Welcome": self.__handle_preferences,
+            "4.2 Ask Area": self.__handle_preferences,
+            "5.2 Ask Price": self.__handle_preferences,
+            "6.2 Ask Food type": self.__handle_preferences,
+            "8.1 Ask for additional preferences": self.__handle_preferences,
+            "9.2 Change 1 of preferences": self.__handle_preferences,
+        }
+
+        # Transitions after a restaurant was suggested only depend on the state and the dialog act,
+        # looked up by (current state, dialog act), every action gets the user utterance
+        self._act_handlers = {("10.1 Suggest restaurant", "reqalts"): self.__suggest_alternative}
+        for state in _SUGGESTION_STATES:
+            self._act_handlers[(state, "request")] = self.__provide_information
+        for act in _ACCEPT_INTENTS:
+            self._act_handlers[("10.1 Suggest restaurant", act)] = self.__last_restaurant_statement
+            self._act_handlers[("11.1 Provide information questioned", act)] = self.__last_restaurant_statement
+        for act in _GOODBYE_INTENTS:
+            self._act_handlers[("11.1 Provide information questioned", act)] = self.__say_goodbye
+            self._act_handlers[("12.1 Last restaurant statement", act)] = self.__say_goodbye
 
     def start_dialog(self):
         """
@@ -108,16 +300,77 @@ class dialogAgent():
             # State transition
             state, system_utterance = self.__state_transition(state, user_input)
 
-            if self.debug_mode:
+            if __debug__ and self.debug_mode:
                 print("")
 
             if state != "13.1 Goodbye":
                 # Ouput system_utterance
                 print(f"system: {system_utterance}")
 
-                # User input
-                user_input = input("user: ").strip().lower()
+                # User input, read from stdin directly since none of the line editing of input() is needed
+                sys.stdout.write("user: ")
+                sys.stdout.flush()
+                user_line = sys.stdin.readline()
+                if not user_line:
+                    # Stop the dialog at the end of the input, e.g. when a conversation is piped in
+                    break
+                user_input = user_line.strip().lower()
     
+    def evaluate_batch(self, dialogs: list) -> list:
+        """
+        Run scripted dialogs without user interaction, classifying the utterances of all dialogs in one batch first.
+
+        Inputs:
+            dialogs: List of dialogs, each a list of user utterances in the order they are given.
+
+        Returns:
+            List with for each dialog the (state, system utterance) pairs of every turn, starting with the welcome turn.
+            A dialog stops early when it reaches "13.1 Goodbye".
+        """
+        normalized_dialogs = [[utterance.strip().lower() for utterance in dialog] for dialog in dialogs]
+        dialog_acts = infer_batch(self.model, self.vectorizer, self.label_encoder, self.metadata,
+                                  [utterance for dialog in normalized_dialogs for utterance in dialog])
+
+        results = []
+        offset = 0
+        for dialog in normalized_dialogs:
+            # Every dialog starts from scratch
+            self.__reset_dialog()
+
+            state, system_utterance = self.__state_transition(None, None)
+            turns = [(state, system_utterance)]
+            for utterance, dialog_act in zip(dialog, dialog_acts[offset:offset + len(dialog)]):
+                if state == "13.1 Goodbye":
+                    break
+                state, system_utterance = self.__state_transition(state, utterance, dialog_act)
+                turns.append((state, system_utterance))
+
+            offset += len(dialog)
+            results.append(turns)
+
+        return results
+
+    def __build_restaurant_index(self, restaurants: list) -> dict:
+        """Index restaurants by every combination of area, price range and food type, where each slot can also be 'dontcare'.
+
+        Inputs:
+            restaurants: List of restaurants.
+
+        Returns:
+            Dict mapping (area, price range, food type) keys to the list of restaurants that meet them.
+        """
+        index = defaultdict(list)
+
+        # Add each restaurant under its own values and under 'dontcare' for every slot (8 keys per restaurant)
+        # Values are lowercased once here, like the extracted preferences, so look ups are plain equality
+        for restaurant in restaurants:
+            for area in (restaurant['area'].lower(), "dontcare"):
+                for price_range in (restaurant['pricerange'].lower(), "dontcare"):
+                    for food_type in (restaurant['food'].lower(), "dontcare"):
+                        index[(area, price_range, food_type)].append(restaurant)
+
+        return dict(index)
+
     def __look_up_restaurants(self, area: str = None , priceRange: str = None, food_type: str = None) -> list:
         """Look up restaurants from database, based on given requirements.
 
@@ -129,26 +382,11 @@ class dialogAgent():
         Returns:
             List of restaurants that meet the given requirements.
         """
-        #load dataframe
-        df = pd.read_csv(self.restaurant_info_path)
-
-        # start with a dataframe with all rows
-        matches = df
-
-        # apply the filters if it requested by the user
-        if area.lower() != "dontcare":
-            matches = matches[matches['area'] == area]
+        # 'dontcare' is its own key in the index, so this is a single look up
+        area_key = "dontcare" if area.lower() == "dontcare" else area
+        matches_dict = list(self._restaurant_index.get((area_key, priceRange, food_type), []))
 
-        if food_type != "dontcare":
-            matches = matches[matches['food'] == food_type]
-
-        if priceRange != "dontcare":
-            matches = matches[matches['pricerange'] == priceRange]
-
-        # Convert to dict for better usage
-        matches_dict = matches.to_dict(orient="records") 
-
-        if self.debug_mode:
+        if __debug__ and self.debug_mode:
             print(f"Restaurants matches: {matches_dict}") # debug
 
         return matches_dict
@@ -164,104 +402,69 @@ class dialogAgent():
         Returns:
             List of restaurants that meet the additional preferences.
         """
-        restaurants_to_remove = []
+        matching_restaurants = []
+        touristic, assigned_seats, children, romantic = self.touristic, self.assigned_seats, self.children, self.romantic
 
-        # Loop trough every restaurant and check if it meets the additional preferences
+        # Loop trough every restaurant and check if it meets the additional preferences,
+        # a restaurant is skipped at the first preference it doesn't meet
         for restaurant in possible_restaurants:
-            remove_restaurant = False
-
-            if self.touristic:
-                if restaurant["food"] == "romanian":
-                    romanian = True
+            reasoning = ""
+
+            if touristic:
+                # romanian priority over cheap and good
+                if restaurant["food"] == "romanian" or restaurant["pricerange"] != "cheap" or restaurant["food_quality"] != "good":
+                    continue
+                # explain why this restaurant fits the additional requirements
+                reasoning = f"This restaurant is great for tourists, because the food quality is {restaurant["food_quality"]} and the food is {restaurant["pricerange"]}."
+
+            if assigned_seats or romantic:
+                crowdedness = restaurant["crowdedness"]
+            if children or romantic:
+                length_of_stay = restaurant["length_of_stay"]
+
+            if assigned_seats:
+                if crowdedness != "busy":
+                    continue
+                if reasoning:
+                    reasoning += f" This restaurant is also assignes your seats because the crowdedness is {crowdedness}."
                 else:
-                    romanian = False
+                    reasoning = f"This restaurant assignes your seats because the crowdedness is {crowdedness}."
 
-                if restaurant["pricerange"] == "cheap" and restaurant["food_quality"] == "good":
-                    cheap_good = True
-                else:
-                    cheap_good = False
-                
-                if romanian: # romanian priority over cheap and good
-                    remove_restaurant = True
-                elif cheap_good == False:
-                    remove_restaurant = True
-                else:
-                    # explain why this restaurant fits the additional requirements
-                    restaurant["reasoning_explained"] = f"This restaurant is great for tourists, because the food quality is {restaurant["food_quality"]} and the food is {restaurant["pricerange"]}."
-            
-            if self.assigned_seats:
-                if restaurant["crowdedness"] != "busy":
-                    remove_restaurant = True
-                else:
-                    # explain why this restaurant fits the additional requirements
-                    if "reasoning_explained" in restaurant:
-                        restaurant["reasoning_explained"] += f" This restaurant is also assignes your seats because the crowdedness is {restaurant["crowdedness"]}."
-                    else:
-                        restaurant["reasoning_explained"] = f"This restaurant assignes your seats because the crowdedness is {restaurant["crowdedness"]}."
-            
-            if self.children:
-                if restaurant["length_of_stay"] == "long":
-                    remove_restaurant = True
-                else:
-                    # explain why this restaurant fits the additional requirements
-                    if "reasoning_explained" in restaurant: #self.touristic or self.assigned_seats:
-                        restaurant["reasoning_explained"] += f" Also this restaurant is good for taking children to, because your expected to stay for a {restaurant["length_of_stay"]} time."
-                    else:
-                        restaurant["reasoning_explained"] = f"This restaurant is good for taking children to, because your expected to stay for a {restaurant["length_of_stay"]} time."
-                
-            if self.romantic:
-                if restaurant["crowdedness"] == "busy":
-                    busy = True
-                else:
-                    busy = False
-                
-                if restaurant["length_of_stay"] == "long":
-                    long_stay = True
+            if children:
+                if length_of_stay == "long":
+                    continue
+                if reasoning:
+                    reasoning += f" Also this restaurant is good for taking children to, because your expected to stay for a {length_of_stay} time."
                 else:
-                    long_stay = False
-                
-                if long_stay == False: 
-                    remove_restaurant = True
-                elif busy:
-                    remove_restaurant = True
+                    reasoning = f"This restaurant is good for taking children to, because your expected to stay for a {length_of_stay} time."
+
+            if romantic:
+                if length_of_stay != "long" or crowdedness == "busy":
+                    continue
+                if reasoning:
+                    reasoning += f" This restaurant is also romantic, because crowdedness is {crowdedness} and you are expected to stay for a {length_of_stay} time."
                 else:
-                    # explain why this restaurant fits the additional requirements
-                    if "reasoning_explained" in restaurant:
-                        restaurant["reasoning_explained"] += f" This restaurant is also romantic, because crowdedness is {restaurant["crowdedness"]} and you are expected to stay for a {restaurant["length_of_stay"]} time."
-                    else:
-                        restaurant["reasoning_explained"] = f"This restaurant is romantic, because crowdedness is {restaurant["crowdedness"]} and you are expected to stay for a {restaurant["length_of_stay"]} time."
-            
-            if remove_restaurant:
-                # possible_restaurants.remove(restaurant)
-                restaurants_to_remove.append(restaurant)
-        
-        # Remove restaurants that do not meet the additional preferences
-        for remove_res in restaurants_to_remove:
-            possible_restaurants.remove(remove_res)
+                    reasoning = f"This restaurant is romantic, because crowdedness is {crowdedness} and you are expected to stay for a {length_of_stay} time."
+
+            # Keep restaurants that meet the additional preferences, the explanation goes on a copy so the cached records stay unchanged
+            if reasoning:
+                matching_restaurants.append({**restaurant, "reasoning_explained": reasoning})
+            else:
+                matching_restaurants.append(restaurant)
         
-        if self.debug_mode:
-            print(f"\nReasoning rules matches: {possible_restaurants}")
+        if __debug__ and self.debug_mode:
+            print(f"\nReasoning rules matches: {matching_restaurants}")
 
-        return possible_restaurants
+        return matching_restaurants
 
 
-    def __confirm_each_preference(self, slot: str, value: str, ask_state: str, prompt: str) -> tuple:
+    def __confirm_each_preference(self, pending: _PendingPreference) -> tuple:
         """
         Store pending preference and return confirmation state output.
-        pending_slot/pending_value store the slot name and proposed value currently awaiting yes/no.
-        pending_state/pending_prompt let us fall back to the original question if the user says "no".
-        pending_message is the confirmation prompt we just asked.
         """
-        chosen_value = "don't care" if value == "dontcare" else value
-        message = f"You chose {slot} {chosen_value}. Is that correct?"
-
-        self.pending_slot = slot
-        self.pending_value = value
-        self.pending_state = ask_state
-        self.pending_prompt = prompt
-        self.pending_message = message
+        self.pending = pending
 
-        return "Confirm preference", message
+        return "Confirm preference", pending.message
 
 
     def __start_next_confirmation(self):
@@ -269,51 +472,64 @@ class dialogAgent():
         if not self.pending_queue:
             return None, None
 
-        entry = self.pending_queue.pop(0)
-        return self.__confirm_each_preference(
-            entry["slot"],
-            entry["value"],
-            entry["ask_state"],
-            entry["prompt"],
-        )
+        return self.__confirm_each_preference(self.pending_queue.pop(0))
 
 
     def __reset_dialog(self) -> None:
-        """Reset collected preferences and confirmation state."""
-        # Clear everything the confirmation flow tracks so a restart starts fresh.
+        """Reset collected preferences, confirmation state and the order preferences are asked in, for a restart or a new dialog."""
+        # Clear everything the dialog tracks so a restart starts fresh.
         self.area = None
         self.price = None
         self.food = None
-        self.restaurants = []
+        self.restaurants = deque()
         self.sugg_restaurant = None 
-        self.state_history = []
-        self.pending_slot = None
-        self.pending_value = None
-        self.pending_state = None
-        self.pending_prompt = None
-        self.pending_message = None
-
-    def __formal_informal(self, formal_utterance: str, informal_utterance: str) -> str:
-        """Return either a formal or informal utterance based on the informal_utterances toggle.
-        
+        self.state_history = deque(maxlen=STATE_HISTORY_SIZE)
+        self.pending = None
+        self.pending_queue = []
+        self.prefference_order = list(_PREFERENCE_ORDER)
+
+    @property
+    def informal_utterances(self) -> bool:
+        """Whether the agent responds with informal instead of formal utterances."""
+        return self._msg is INFORMAL_MSGS
+
+    @informal_utterances.setter
+    def informal_utterances(self, informal: bool) -> None:
+        """Select the message table once, so responses don't have to check the toggle every turn.
+
+        Inputs:
+            informal: Use the informal messages when true, the formal ones otherwise.
+        """
+        self._msg = INFORMAL_MSGS if informal else FORMAL_MSGS
+
+    def __state_transition(self, current_state: str, utterance: str, dialog_act: str = None) -> tuple:
+        """
+        Determine the next state and save it in the state history.
+
         Inputs:
-            formal_utterance: Formal version of the utterance.
-            informal_utterance: Informal version of the utterance.
+            current_state: Current state of the dialog.
+            utterance: User input utterance.
+            dialog_act: Dialog act of the utterance if it was already classified, otherwise it is classified here.
+
         Returns:
-            Chosen utterance based on the informal_utterances toggle.
+            next_state: Next state of the dialog.
+            response_utterance: System response utterance.
         """
-        
-        if self.informal_utterances:
-            return informal_utterance
-        return formal_utterance
+        next_state, response_utterance = self.__next_state(current_state, utterance, dialog_act)
 
-    def __state_transition(self, current_state: str, utterance: str) -> tuple:
+        # Save state in state_history, done once here for every branch of __next_state
+        self.state_history.append(next_state)
+
+        return next_state, response_utterance
+
+    def __next_state(self, current_state: str, utterance: str, dialog_act: str = None) -> tuple:
         """
         Classifies dialog act, extract information from utterances using keywords and transition to the next state based on important variables. 
         
         Inputs:
             current_state: Current state of the dialog.
             utterance: User input utterance.
+            dialog_act: Dialog act of the utterance if it was already classified, otherwise it is classified here.
         
         Returns:
             next_state: Next state of the dialog.
@@ -321,173 +537,147 @@ class dialogAgent():
         """
         next_state = None
         response_utterance = None
+        debug_mode = self.debug_mode
+
+        # Normalize the utterance once, every check below works on this version
+        normalized_utt = utterance.strip().lower() if utterance is not None else None
 
         # Classify dialog act only is there is an utterance otherwise it would result into an error
-        if utterance != None:
-            classified_dialog_act = infer_utterance(self.model, self.vectorizer, self.label_encoder, self.metadata, utterance)
+        if utterance == None:
+            classified_dialog_act = ""
 
-            if self.debug_mode:
-                print(f"user utterance classified as: {classified_dialog_act}")
+        # Keywords that decide the dialog act on their own skip the classifier
+        elif self.allow_restart and _RESTART_RE.search(normalized_utt) is not None:
+            if __debug__ and debug_mode:
+                print("Restart keywords detected in user utterance.")
+            classified_dialog_act = "restart"
+
+        elif self.confirm_preferences and current_state == "Confirm preference" and normalized_utt in _YES_ANSWERS:
+            if __debug__ and debug_mode:
+                print("Detected manual confirmation keyword.")
+            classified_dialog_act = "confirm"
+
+        elif self.confirm_preferences and current_state == "Confirm preference" and normalized_utt in _NO_ANSWERS:
+            if __debug__ and debug_mode:
+                print("Detected manual denial keyword.")
+            classified_dialog_act = "deny"
 
         else:
-            classified_dialog_act = ""
+            classified_dialog_act = dialog_act if dialog_act is not None else self._classify(normalized_utt)
 
-        if self.allow_restart and utterance:
-            # Lightweight keyword fallback in case the classifier misses the restart intent.
-            normalized_utt = utterance.lower()
-            restart_phrases = ["restart", "start over", "start again", "reset"]
-            if classified_dialog_act not in {"restart"}:
-                if any(phrase in normalized_utt for phrase in restart_phrases):
-                    if self.debug_mode:
-                        print("Restart keywords detected in user utterance.")
-                    classified_dialog_act = "restart"
+            if __debug__ and debug_mode:
+                print(f"user utterance classified as: {classified_dialog_act}")
 
         if self.allow_restart and classified_dialog_act == "restart":
             # State 0. Restart
-            if self.debug_mode:
+            if __debug__ and debug_mode:
                 print("Restart requested. Resetting dialog state.")
 
             self.__reset_dialog()
             next_state = "1. Welcome"
-            response_utterance = self.__formal_informal(WELCOME_MESSAGE, WELCOME_MESSAGE_INFORMAL)
+            response_utterance = self._msg["welcome"]
 
-            self.state_history.append(next_state)
-            return next_state, response_utterance
+            # The restarted dialog asks the preferences in a new random order, like a new dialog does
+            if self.random_order:
+                random.shuffle(self.prefference_order)
 
-        confirm_intents = {"confirm", "affirm"}
-        deny_intents = {"deny", "negate"}
+            return next_state, response_utterance
 
-        if self.confirm_preferences and current_state == "Confirm preference" and utterance:
+        if self.confirm_preferences and current_state == "Confirm preference" and normalized_utt:
             # Handle manual confirmation fallbacks so short yes/no answers still register.
             # Allow simple yes/no replies even when the classifier mislabels them.
-            normalized_utt = utterance.lower().strip()
-            yes_words = {"yes", "yeah", "yep", "sure", "correct", "absolutely", "affirmative", "right"}
-            no_words = {"no", "nope", "nah", "negative", "not really", "don't"}
-
-            if classified_dialog_act not in confirm_intents | deny_intents:
+            if classified_dialog_act not in _YES_NO_INTENTS:
                 # Check the first token to capture phrases like "yes please" or "no thanks".
-                first_word = normalized_utt.split()[0]
-                if normalized_utt in yes_words or first_word in yes_words:
-                    if self.debug_mode:
+                if _YES_RE.match(normalized_utt) is not None:
+                    if __debug__ and debug_mode:
                         print("Detected manual confirmation keyword.")
                     classified_dialog_act = "confirm"
-                elif normalized_utt in no_words or first_word in no_words:
-                    if self.debug_mode:
+                elif _NO_RE.match(normalized_utt) is not None:
+                    if __debug__ and debug_mode:
                         print("Detected manual denial keyword.")
                     classified_dialog_act = "deny"
 
         if self.confirm_preferences and current_state == "Confirm preference":
             # Resolve the pending confirmation once we have a confirmed dialog act.
-            if self.pending_slot is None:
-                # No pending slot means we can return to whichever state we were heading to.
-                current_state = self.pending_state or current_state
-            elif classified_dialog_act in confirm_intents:
+            if self.pending is None:
+                # No pending slot means there is nothing to resolve, carry on from the current state.
+                pass
+            elif classified_dialog_act in _CONFIRM_INTENTS:
                 # Persist the new preference and advance to any queued confirmations.
-                resolved_state = self.pending_state or current_state
-                slot_to_set = self.pending_slot
-                value_to_set = self.pending_value
+                confirmed = self.pending
+                resolved_state = confirmed.ask_state or current_state
 
-                setattr(self, slot_to_set, value_to_set)
+                setattr(self, confirmed.slot, confirmed.value)
 
-                if self.debug_mode:
-                    print(f"{slot_to_set.capitalize()} confirmed as: {value_to_set}")
+                if __debug__ and debug_mode:
+                    print(f"{confirmed.slot.capitalize()} confirmed as: {confirmed.value}")
 
-                self.pending_slot = None
-                self.pending_value = None
-                self.pending_state = None
-                self.pending_prompt = None
-                self.pending_message = None
+                self.pending = None
 
                 # Continue with the next queued confirmation if we captured multiple slots.
                 next_state, next_message = self.__start_next_confirmation()
                 if next_state:
-                    self.state_history.append(next_state)
                     return next_state, next_message
 
                 current_state = resolved_state
                 classified_dialog_act = ""
-            elif classified_dialog_act in deny_intents:
+            elif classified_dialog_act in _DENY_INTENTS:
                 # Revert to the previous state when the user rejects the pending preference.
-                next_state = self.pending_state or "1. Welcome"
-                response_utterance = self.pending_prompt or "Could you repeat that preference?"
-
-                self.pending_slot = None
-                self.pending_value = None
-                self.pending_state = None
-                self.pending_prompt = None
-                self.pending_message = None
+                next_state = self.pending.ask_state or "1. Welcome"
+                response_utterance = self.pending.prompt or "Could you repeat that preference?"
+
+                self.pending = None
                 self.pending_queue = []
 
-                self.state_history.append(next_state)
                 return next_state, response_utterance
             else:
                 # Keep asking for confirmation until we get a clear yes/no signal.
                 next_state = "Confirm preference"
                 # Re-ask whichever confirmation message is currently pending.
-                response_utterance = self.pending_message or "Please answer yes or no so I can confirm."
-                self.state_history.append(next_state)
+                response_utterance = self.pending.message if self.pending else "Please answer yes or no so I can confirm."
                 return next_state, response_utterance
 
+        # Without confirmations, new preferences after a suggestion can't change the dialog anymore, so skip extracting them
+        preferences_locked = (
+            not self.confirm_preferences
+            and current_state in _SUGGESTION_STATES
+            and None not in (self.area, self.price, self.food)
+        )
+
         # Extract info based on dialog act (could be call to function)
         # only change value to 'dontcare' for the assiciated current state
-        if classified_dialog_act == 'inform' or (classified_dialog_act in ["request", "reqalts"] and current_state in ["1. Welcome", "4.2 Ask Area", "5.2 Ask Price", "6.2 Ask Food type"]):
-            output = extract_keywords(utterance)
+        if (classified_dialog_act == 'inform' and not preferences_locked) or (classified_dialog_act in _SLOT_FILLING_INTENTS and current_state in _PREFERENCE_STATES):
+            output = extract_keywords(normalized_utt)
             captured_entries = []
 
-            if self.debug_mode:
+            if __debug__ and debug_mode:
                 print("extract keywords output", output)
 
-            if output['area'] != None:
-                if (output['area'] == 'dontcare' and current_state == "4.2 Ask Area") or output['area'] != 'dontcare':
-                    if self.confirm_preferences:
-                        captured_entries.append({
-                            "slot": "area",
-                            "value": output['area'],
-                            "ask_state": "4.2 Ask Area",
-                            "prompt": "What part of town do you have in mind?",
-                        })
-                    else:
-                        self.area = output['area']
+            for output_key, slot, ask_state, prompt_key in self._SLOTS:
+                value = output[output_key]
+                if value == None:
+                    continue
 
-            if output["pricerange"] != None:
-                if (output['pricerange'] == 'dontcare' and current_state == "5.2 Ask Price") or output['pricerange'] != 'dontcare':
+                # 'dontcare' only counts when the agent just asked for this slot
+                if (value == 'dontcare' and current_state == ask_state) or value != 'dontcare':
                     if self.confirm_preferences:
-                        captured_entries.append({
-                            "slot": "price",
-                            "value": output['pricerange'],
-                            "ask_state": "5.2 Ask Price",
-                            "prompt": "How pricey would you like the restaurant to be?",
-                        })
+                        captured_entries.append(_PendingPreference(slot, value, ask_state, FORMAL_MSGS[prompt_key]))
                     else:
-                        self.price = output['pricerange']
-
-            if output["food"] != None:
-                if (output['food'] == 'dontcare' and current_state == "6.2 Ask Food type") or output['food'] != 'dontcare':
-                    if self.confirm_preferences:
-                        captured_entries.append({
-                            "slot": "food",
-                            "value": output['food'],
-                            "ask_state": "6.2 Ask Food type",
-                            "prompt": "What kind of food would you like?",
-                        })
-                    else:
-                        self.food = output['food']
+                        setattr(self, slot, value)
 
             if self.confirm_preferences and captured_entries:
                 self.pending_queue.extend(captured_entries)
 
-                if self.pending_slot is None:
+                if self.pending is None:
                     next_state, response_utterance = self.__start_next_confirmation()
                     if next_state:
-                        self.state_history.append(next_state)
                         return next_state, response_utterance
 
                 next_state = "Confirm preference"
-                response_utterance = self.pending_message or "Please answer yes or no so I can confirm."
-                self.state_history.append(next_state)
+                response_utterance = self.pending.message if self.pending else "Please answer yes or no so I can confirm."
                 return next_state, response_utterance
 
-            if self.debug_mode:
+            if __debug__ and debug_mode:
                 print(f"Area changed to: {self.area}") # debug
                 print(f"Price changed to: {self.price}") # debug
                 print(f"Food changed to: {self.food}") # debug
@@ -503,58 +693,69 @@ class dialogAgent():
 
         # 3.1 What is the first item in list 'order'
         # Assign current state based on prefference order
-        if current_state in ["1. Welcome", "4.2 Ask Area", "5.2 Ask Price", "6.2 Ask Food type"] and len(self.prefference_order) != 0:
+        if current_state in _PREFERENCE_STATES and len(self.prefference_order) != 0:
             current_state = self.prefference_order[0]
             
-            if self.debug_mode:
+            if __debug__ and debug_mode:
                 print(f"Current values: area={self.area}, price={self.price}, food={self.food}")
 
-        # State transitions
+        # State transitions, a (state, dialog act) action if there is one, otherwise the handler of the current state decides the next state
+        action = self._act_handlers.get((current_state, classified_dialog_act))
+        if action is not None:
+            next_state, response_utterance = action(normalized_utt)
+        else:
+            handler = self._state_handlers.get(current_state, self.__handle_unknown)
+            next_state, response_utterance = handler(current_state, classified_dialog_act, normalized_utt)
 
-        # State 0 to "1. Welcome"
-        if current_state is None and utterance is None:
-            # State "1. Welcome"
-            next_state = "1. Welcome"
-            
-            response_utterance = self.__formal_informal(WELCOME_MESSAGE, WELCOME_MESSAGE_INFORMAL)
+        # To exit programme (DEBUG)
+        if normalized_utt == "exit" and self.debug_mode:
+            next_state = "13.1 Goodbye"
+            response_utterance = "Goodbye!"
 
-            # 2.2 Randomize list 'order'
-            if self.random_order: # 2.1 Randomize order?
-                random.shuffle(self.prefference_order)
+        return next_state, response_utterance
 
-            if self.debug_mode:
-                print("Entered State '1. Welcome'")
+    def __handle_start(self, current_state: str, classified_dialog_act: str, utterance: str) -> tuple:
+        """
+        Handle the very first turn, where there is no state yet, by welcoming the user.
 
-        # State "1. Welcome" or "4.2 Ask Area" to "4.2 Ask Area"
-        elif current_state  == "4.2 Ask Area" and self.area == None: # 4.1 Area Known?
-            # State "4.2 Ask Area"
-            next_state = "4.2 Ask Area"
+        Inputs:
+            current_state: Current state of the dialog.
+            classified_dialog_act: Dialog act of the user utterance.
+            utterance: User input utterance.
 
-            response_utterance = self.__formal_informal("What part of town do you have in mind?", "Where about in town do you wanna eat?")
+        Returns:
+            next_state: Next state of the dialog.
+            response_utterance: System response utterance.
+        """
+        if utterance is not None:
+            return self.__handle_unknown(current_state, classified_dialog_act, utterance)
+
+        # State 0 to "1. Welcome"
+        next_state = "1. Welcome"
 
-            if self.debug_mode:
-                print("Entered State '4.2 Ask Area'")
+        response_utterance = self._msg["welcome"]
 
-        # State "1. Welcome" or "4.2 Ask Area" or "5.2 Ask Price" to "5.2 Ask Price"
-        elif current_state == "5.2 Ask Price" and self.price == None: # 5.1 Price known?
-            # State "5.2 Ask Price"
-            next_state = "5.2 Ask Price"
+        # 2.2 Randomize list 'order'
+        if self.random_order: # 2.1 Randomize order?
+            random.shuffle(self.prefference_order)
 
-            response_utterance = self.__formal_informal("How pricey would you like the restaurant to be?", "How pricey do you want your meal to be?")
+        if __debug__ and self.debug_mode:
+            print("Entered State '1. Welcome'")
 
-            if self.debug_mode:
-                print("Entered State '5.2 Ask Price'")
-        
-        # State "1. Welcome" or "4.2 Ask Area" or "5.2 Ask Price" or "6.2 Ask Food type" to "6.2 Ask Food type"
-        elif current_state == "6.2 Ask Food type" and self.food == None: # 6.1 Food type known?
-            # State "6.2 Ask Food type"
-            next_state = "6.2 Ask Food type"
-            
-            response_utterance = self.__formal_informal("What kind of food would you like?", "What kind of food are you in the mood for?")
+        return next_state, response_utterance
+
+    def __handle_preferences(self, current_state: str, classified_dialog_act: str, utterance: str) -> tuple:
+        """Ask for the next unknown preference, or suggest a restaurant once all preferences are known."""
+        # State "1. Welcome" or "4.2 Ask Area" or "5.2 Ask Price" or "6.2 Ask Food type" to the ask state of the next unknown preference
+        ask_preference = self._ASK_STATES.get(current_state)
+        if ask_preference is not None and getattr(self, ask_preference[0]) == None: # 4.1/5.1/6.1 Preference known?
+            next_state = current_state
+
+            response_utterance = self._msg[ask_preference[1]]
+
+            if __debug__ and self.debug_mode:
+                print(f"Entered State '{next_state}'")
 
-            if self.debug_mode:
-                print("Entered State '6.2 Ask Food type'")
-        
         # elif current_state in ["1. Welcome", "4.2 Ask Area", "5.2 Ask Price", "6.2 Ask Food type"] and self.area != None and self.price != None and self.food != None:
         #     # State "8.1 Ask for additional preferences"
         #     next_state = "8.1 Ask for additional preferences"
@@ -562,140 +763,157 @@ class dialogAgent():
         #     response_utterance = self.__formal_informal("Do you have any additional preferences?", "Any more preferences?")
 
         # State "1. Welcome" or "4.2 Ask Area" or "5.2 Ask Price" or "6.2 Ask Food type" or "9.2 Change 1 of preferences" to "9.2 Change 1 of preferences" or "10.1 Suggest restaurant"
-        elif current_state in ["1. Welcome", "4.2 Ask Area", "5.2 Ask Price", "6.2 Ask Food type", "8.1 Ask for additional preferences", "9.2 Change 1 of preferences"] and self.area != None and self.price != None and self.food != None: # 9.1 Is there a match
-            
-            # if current_state == "8.1 Ask for additional preferences":
-            #     # extract preferences from utterance
-            #     if "romantic" in utterance:
-            #         self.romantic = True
-            #     
-            #     if "children" in utterance:
-            #         self.children = True
-            #     
-            #     if "assigned" in utterance and "seats" in utterance:
-            #         self.assigned_seats = True
-            #     
-            #     if "touristic" in utterance:
-            #         self.touristic = True
+        elif self.area != None and self.price != None and self.food != None: # 9.1 Is there a match
+            next_state, response_utterance = self.__suggest_restaurant()
+
+        else:
+            next_state, response_utterance = self.__handle_unknown(current_state, classified_dialog_act, utterance)
+
+        return next_state, response_utterance
+
+    def __suggest_restaurant(self) -> tuple:
+        """Look up restaurants that meet all preferences and suggest one of them, or ask to change a preference if there are none."""
+        # if current_state == "8.1 Ask for additional preferences":
+        #     # extract preferences from utterance
+        #     if "romantic" in utterance:
+        #         self.romantic = True
+        #     
+        #     if "children" in utterance:
+        #         self.children = True
+        #     
+        #     if "assigned" in utterance and "seats" in utterance:
+        #         self.assigned_seats = True
+        #     
+        #     if "touristic" in utterance:
+        #         self.touristic = True
+        
+        # Look up possible restaurants that meet requirements
+        possible_restaurants = self.__look_up_restaurants(self.area, self.price, self.food)
+        
+        # Filter possible_restaurants based on additional preferences
+        filtered_possible_restaurants = self.__reasoning_rules_filter(possible_restaurants)
+
+        possible_restaurant_count = len(filtered_possible_restaurants)
+
+        if possible_restaurant_count == 0: # If there are no restaurants that meet requirements
+            # State "9.2 Change 1 of preferences"
+            next_state = "9.2 Change 1 of preferences"
             
-            # Look up possible restaurants that meet requirements
-            possible_restaurants = self.__look_up_restaurants(self.area, self.price, self.food)
+            response_utterance = self._msg["no_match"]
             
-            # Filter possible_restaurants based on additional preferences
-            filtered_possible_restaurants = self.__reasoning_rules_filter(possible_restaurants)
+            if __debug__ and self.debug_mode:
+                print("Entered State '9.2 Change 1 of preferences'")
 
-            possible_restaurant_count = len(filtered_possible_restaurants)
+        else:
+            if possible_restaurant_count == 1: # If there is one restaurant that meet requirements
+                self.sugg_restaurant = filtered_possible_restaurants[0]
 
-            if possible_restaurant_count == 0: # If there are no restaurants that meet requirements
-                # State "9.2 Change 1 of preferences"
-                next_state = "9.2 Change 1 of preferences"
-                
-                response_utterance = self.__formal_informal("There are no restaurants that meet your requirements. Would you like to change the area, pricerange or foodtype? And what would you like to change it to?", "Sorry man, no restaurants meet your preference. Please try a different area, price range or food type.")
+                # explain reasoning if additional preferences were given
+                response_utterance = self._msg["only_match"].format(name=self.sugg_restaurant["restaurantname"], reasoning=self.sugg_restaurant.get("reasoning_explained", ""))
+
+            else: # If there are multiple restaurants that meet requirements
+                # Shuffle once, suggest the first restaurant and save the others in that random order
+                random.shuffle(filtered_possible_restaurants)
+                self.restaurants = deque(filtered_possible_restaurants)
+                self.sugg_restaurant = self.restaurants.popleft()
+
+                # explain reasoning if additional preferences were given
+                response_utterance = self._msg["match"].format(name=self.sugg_restaurant["restaurantname"], reasoning=self.sugg_restaurant.get("reasoning_explained", ""))
                 
-                if self.debug_mode:
-                    print("Entered State '9.2 Change 1 of preferences'")
+            # State "10.1 Suggest restaurant"
+            next_state = "10.1 Suggest restaurant"
 
-            else:
-                if possible_restaurant_count == 1: # If there is one restaurant that meet requirements
-                    self.sugg_restaurant = filtered_possible_restaurants[0]
+            if __debug__ and self.debug_mode:
+                print("Entered State '10.1 Suggest restaurant'")
 
-                    # explain reasoning if additional preferences were given
-                    response_utterance = self.__formal_informal(f"{self.sugg_restaurant['restaurantname']} is the only restaurant that meet your requirements. {self.sugg_restaurant["reasoning_explained"] if "reasoning_explained" in self.sugg_restaurant else ""} What information would you like on this restaurant - phone, address or postcode?", f"{self.sugg_restaurant['restaurantname']} is the only match. {self.sugg_restaurant["reasoning_explained"] if "reasoning_explained" in self.sugg_restaurant else ""} What info would you like on this restaurant - phone, address or postcode?")
+        return next_state, response_utterance
 
-                else: # If there are multiple restaurants that meet requirements
-                    # Choose random restaurant and save the others
-                    self.sugg_restaurant = random.choice(filtered_possible_restaurants)
-                    self.restaurants = filtered_possible_restaurants
-                    self.restaurants.remove(self.sugg_restaurant)
+    def __suggest_alternative(self, utterance: str) -> tuple:
+        """Suggest another restaurant that meets the preferences, if there is one left."""
+        # Check if there are other resaurants to suggest
+        if len(self.restaurants) >= 1:
+            # Alternatives are already shuffled, so the next one is a random pick
+            self.sugg_restaurant = self.restaurants.popleft()
 
-                    # explain reasoning if additional preferences were given
-                    response_utterance = self.__formal_informal(f"{self.sugg_restaurant['restaurantname']} is a restaurant that meet your requirements. {self.sugg_restaurant["reasoning_explained"] if "reasoning_explained" in self.sugg_restaurant else ""} What information would you like on this restaurant - phone, address or postcode or an alternative restaurant?", f"{self.sugg_restaurant['restaurantname']} is just what you are looking for. {self.sugg_restaurant["reasoning_explained"] if "reasoning_explained" in self.sugg_restaurant else ""} What info would you like on this restaurant - phone, address or postcode or an alternative restaurant?")
-                    
-                # State "10.1 Suggest restaurant"
-                next_state = "10.1 Suggest restaurant"
+            next_state = "10.1 Suggest restaurant"   
 
-                if self.debug_mode:
-                    print("Entered State '10.1 Suggest restaurant'")
+            # explain reasoning if additional preferences were given
+            response_utterance = self._msg["alternative"].format(name=self.sugg_restaurant["restaurantname"], other="the only other" if len(self.restaurants) == 0 else "another", reasoning=self.sugg_restaurant.get("reasoning_explained", ""))
 
-        # State "10.1 Suggest restaurant" to "10.1 Suggest restaurant"
-        elif current_state == "10.1 Suggest restaurant" and classified_dialog_act == "reqalts":
-            # Check if there are other resaurants to suggest
-            if len(self.restaurants) >= 1:
-                self.sugg_restaurant = random.choice(self.restaurants)
-                self.restaurants.remove(self.sugg_restaurant)
+        else:
+            next_state = "10.1 Suggest restaurant"
 
-                next_state = "10.1 Suggest restaurant"   
+            response_utterance = self._msg["no_alternative"]
 
-                # explain reasoning if additional preferences were given
-                response_utterance = self.__formal_informal(f"{self.sugg_restaurant['restaurantname']} is {"the only other" if len(self.restaurants) == 0 else "another"} restaurant that meet your requirements. {self.sugg_restaurant["reasoning_explained"] if "reasoning_explained" in self.sugg_restaurant else ""} What information would you like on this restaurant - phone, address or postcode or a different restaurant?", f"{self.sugg_restaurant['restaurantname']} is {"the only other" if len(self.restaurants) == 0 else "another"} match. {self.sugg_restaurant["reasoning_explained"] if "reasoning_explained" in self.sugg_restaurant else ""} What info would you like on this restaurant - phone, address or postcode or a different restaurant?")
+        if __debug__ and self.debug_mode:
+            print("Entered State '10.1 Suggest restaurant'")
 
-            else:
-                next_state = "10.1 Suggest restaurant"
+        return next_state, response_utterance
 
-                response_utterance = self.__formal_informal("There are no other restaurant left that meet your requirements. Would you like some infromation about the last suggested restaurant?", "Sorry man no restaurants are left with your requirements, do you want to know something about the last restaurant I suggested.")
+    def __provide_information(self, utterance: str) -> tuple:
+        """Give the phone number, address and/or postcode of the suggested restaurant, based on what is asked in 'utterance'."""
+        # Generate response utterance based on requested info, like phone number, address or postcode
+        if _PHONE_RE.search(utterance) is not None:
+            response_utterance = self._msg["phone"].format(name=self.sugg_restaurant["restaurantname"], phone=self.sugg_restaurant["phone"])
+        
+        elif _ADDRESS_RE.search(utterance) is not None:
+            response_utterance = self._msg["addr"].format(name=self.sugg_restaurant["restaurantname"], addr=self.sugg_restaurant["addr"])
+        
+        elif _POSTCODE_RE.search(utterance) is not None:
+            response_utterance = self._msg["postcode"].format(name=self.sugg_restaurant["restaurantname"], postcode=self.sugg_restaurant["postcode"])
 
-            if self.debug_mode:
-                print("Entered State '10.1 Suggest restaurant'")
+        else:
+            response_utterance = self._msg["details"].format(name=self.sugg_restaurant["restaurantname"], phone=self.sugg_restaurant["phone"], addr=self.sugg_restaurant["addr"], postcode=self.sugg_restaurant["postcode"])
 
-        # State "10.1 Suggest restaurant" or "11.1 Provide information questioned" or "12.1 Last restaurant statement" to "11.1 Provide information questioned"
-        elif current_state in ["10.1 Suggest restaurant", "11.1 Provide information questioned", "12.1 Last restaurant statement"] and classified_dialog_act == "request":
-            # Generate response utterance based on requested info, like phone number, address or postcode
-            if any(word in utterance for word in ["phone", "phonenumber", "telephone", "number"]):
-                response_utterance = self.__formal_informal(f"The phone number of restaurant {self.sugg_restaurant['restaurantname']} is {self.sugg_restaurant['phone']}", f"You can call {self.sugg_restaurant['restaurantname']} with {self.sugg_restaurant['phone']}")
-            
-            elif any(word in utterance for word in ["address","adress","street"]):
-                response_utterance = self.__formal_informal(f"The address of {self.sugg_restaurant['restaurantname']} is {self.sugg_restaurant['addr']}", f"{self.sugg_restaurant['restaurantname']} is on {self.sugg_restaurant['addr']}")
-            
-            elif any(word in utterance for word in ["postal", "postcode", "zip", "post", "code"]):
-                response_utterance = self.__formal_informal(f"The postcode of {self.sugg_restaurant['restaurantname']} is {self.sugg_restaurant['postcode']}", f"You can find {self.sugg_restaurant['restaurantname']} over here {self.sugg_restaurant['postcode']}")
+        # State "11.1 Provide information questioned"
+        next_state = "11.1 Provide information questioned"
 
-            else:
-                response_utterance = self.__formal_informal(f"The detail information of {self.sugg_restaurant['restaurantname']} are phone number: '{self.sugg_restaurant['phone']}', address: '{self.sugg_restaurant['addr']}' and postcode: '{self.sugg_restaurant['postcode']}'", f"Here you have some information about {self.sugg_restaurant['restaurantname']}, phone number: '{self.sugg_restaurant['phone']}', address: '{self.sugg_restaurant['addr']}' and postcode: '{self.sugg_restaurant['postcode']}'")
+        if __debug__ and self.debug_mode:
+            print("Entered State '11.1 Provide information questioned'")
 
-            # State "11.1 Provide information questioned"
-            next_state = "11.1 Provide information questioned"
+        return next_state, response_utterance
 
-            if self.debug_mode:
-                print("Entered State '11.1 Provide information questioned'")
+    def __last_restaurant_statement(self, utterance: str) -> tuple:
+        """Make a closing statement about the suggested restaurant."""
+        # "12.1 Last restaurant statement"
+        next_state = "12.1 Last restaurant statement"
+        response_utterance = self._msg["last_statement"].format(name=self.sugg_restaurant["restaurantname"])
 
-        # State "10.1 Suggest restaurant" to "12.1 Last restaurant statement"    
-        elif current_state in ["10.1 Suggest restaurant", "11.1 Provide information questioned"] and classified_dialog_act in {"confirm", "affirm", "null"}:
-            # "12.1 Last restaurant statement"
-            next_state = "12.1 Last restaurant statement"
-            response_utterance = self.__formal_informal(f"Restaurant {self.sugg_restaurant['restaurantname']} is an outstanding restaurant.", f"Restaurant {self.sugg_restaurant['restaurantname']} is great! You will love it!")
+        if __debug__ and self.debug_mode:
+            print("Entered State '12.1 Last restaurant statement'")
 
-            if self.debug_mode:
-                print("Entered State '12.1 Last restaurant statement'")
-        
-        # State "12.1 Last restaurant statement" or "11.1 Provide information questioned" to "13.1 Goodbye"
-        elif current_state in ["11.1 Provide information questioned", "12.1 Last restaurant statement"] and classified_dialog_act in ["bye", 'thankyou']:
-            # "13.1 Goodbye"
-            next_state = "13.1 Goodbye"
-            response_utterance = None
+        return next_state, response_utterance
 
-            if self.debug_mode:
-                print("Entered State '13.1 Goodbye'")
-        else:
-            next_state = current_state
-            response_utterance = self.__formal_informal("I didn't understand, could you rephrase it in a different way?", "Sorry man, didn't get that can you rephrase it?")
+    def __say_goodbye(self, utterance: str) -> tuple:
+        """End the dialog."""
+        # "13.1 Goodbye"
+        next_state = "13.1 Goodbye"
+        response_utterance = None
 
-            if self.debug_mode:
-                print(f"Entered no state with next_state: '{next_state}' and response_utterance: '{response_utterance}'")
+        if __debug__ and self.debug_mode:
+            print("Entered State '13.1 Goodbye'")
 
+        return next_state, response_utterance
 
-        # To exit programme (DEBUG)
-        if utterance == "exit" and self.debug_mode:
-            next_state = "13.1 Goodbye"
-            response_utterance = "Goodbye!"
+    def __handle_unknown(self, current_state: str, classified_dialog_act: str, utterance: str) -> tuple:
+        """Stay in the current state and ask the user to rephrase, used when no transition fits the utterance."""
+        next_state = current_state
+        response_utterance = self._msg["not_understood"]
 
-        # Save state in state_history
-        self.state_history.append(next_state)
+        if __debug__ and self.debug_mode:
+            print(f"Entered no state with next_state: '{next_state}' and response_utterance: '{response_utterance}'")
 
         return next_state, response_utterance
 
 if __name__ == "__main__":
+    from expand_csv import expand_csv
+
     # expand csv to include 3 new columns: food_quality, crowdedness, length_of_stay
-    expand_csv(Path("datasets/restaurant_info.csv"), Path("datasets/expanded_restaurant_info.csv"))
+    # only when the expanded file is missing or older than the restaurant info it is based on
+    restaurant_info_csv = Path("datasets/restaurant_info.csv")
+    expanded_restaurant_info_csv = Path("datasets/expanded_restaurant_info.csv")
+    if not expanded_restaurant_info_csv.exists() or expanded_restaurant_info_csv.stat().st_mtime < restaurant_info_csv.stat().st_mtime:
+        expand_csv(restaurant_info_csv, expanded_restaurant_info_csv)
 
     # Initialize dialog agent
     agent = dialogAgent(model_path='saved_models/decision_tree')
@@ -56,12 +56,33 @@ def infer_utterance(model, vectorizer, label_encoder, metadata, utterance):
     if utterance is None:
         raise ValueError("utterance must be provided")
 
-    # Vectorize the single utterance and decode the predicted class label
-    features = vectorizer.transform([utterance])
-    prediction = model.predict(features)
-    label = label_encoder.inverse_transform(prediction)[0]
+    return infer_batch(model, vectorizer, label_encoder, metadata, [utterance])[0]
 
-    return str(label)
+def infer_batch(model, vectorizer, label_encoder, metadata, utterances):
+    """Predict dialog-act labels for many `utterances` at once.
+
+    Vectorizing and predicting the whole batch in one call avoids paying the
+    vectorizer and estimator overhead for every single utterance.
+
+    Inputs:
+        model: Trained classifier exposing `predict`.
+        vectorizer: Text vectorizer implementing `transform`.
+        label_encoder: Encoder used to map prediction indices to labels.
+        metadata: Optional dictionary with model metadata (unused here).
+        utterances: Sequence of text strings to classify.
+    Returns:
+        List of predicted dialog-act labels as strings, aligned with `utterances`.
+    """
+    utterances = list(utterances)
+    if not utterances:
+        return []
+
+    # Vectorize all utterances together and decode the predicted class labels
+    features = vectorizer.transform(utterances)
+    predictions = model.predict(features)
+    labels = label_encoder.inverse_transform(predictions)
+
+    return [str(label) for label in labels]
 
 def main():
     """Entry point for running offline inference with a saved model.
@@ -1,5 +1,6 @@
 import csv
 import re
+from functools import lru_cache
 from pathlib import Path
 from Levenshtein import distance as levenshtein_distance
 
@@ -178,6 +179,11 @@ slot_mention_patterns = {
     for slot, keywords in slot_mention_keyword_map.items()
 }
 
+# patterns for the slot values themselves, built once instead of on every extraction
+price_patterns = make_regex_patterns(pricerange_options | set(pricerange_keyword_map.keys()))
+area_patterns = make_regex_patterns(area_options | set(area_keyword_map.keys()))
+food_patterns = make_regex_patterns(food_options | set(food_keyword_map.keys()))
+
 def first_match(patterns, text):
     """Return the first keyword whose regex matches the text.
 
@@ -245,7 +251,31 @@ def map_keyword_to_option(keyword, keyword_map, options):
     else:
         return None
 
-def fuzzy_find_keyword(text: str, keyword_map, options, max_distance: int = 3):
+def make_fuzzy_candidates(keyword_map, options):
+    """Prepare the phrases fuzzy matching compares the utterance against.
+
+    Inputs:
+        keyword_map: Synonym-to-canonical mapping for the slot.
+        options: Set of valid canonical values (including `dontcare`).
+    Returns:
+        List of tuples `(cleaned_phrase, canonical_value, word_count)` for every phrase that maps to an allowed option.
+    """
+    candidates = []
+    for candidate in options | set(keyword_map.keys()):  # iterate over every potential target phrase, canonical values and synonyms
+        candidate_clean = clean_text(candidate)  # normalise the candidate for comparison
+        if not candidate_clean:  # skip empty strings after cleaning
+            continue
+
+        mapped_value = map_keyword_to_option(candidate_clean, keyword_map, options)  # resolve synonyms to canonical values
+        if mapped_value is None:  # ignore anything that doesn't map to an allowed option
+            continue
+
+        word_count = max(1, len(candidate_clean.split()))  # match n-gram length to candidate word count
+        candidates.append((candidate_clean, mapped_value, word_count))
+
+    return candidates
+
+def fuzzy_find_keyword(text: str, keyword_map, options, max_distance: int = 3, candidates=None):
     """Recover misspelled slot values using Levenshtein distance.
 
     Inputs:
@@ -253,6 +283,7 @@ def fuzzy_find_keyword(text: str, keyword_map, options, max_distance: int = 3):
         keyword_map: Synonym-to-canonical mapping for the slot.
         options: Set of valid canonical values (including `dontcare`).
         max_distance: Maximum edit distance tolerated for matches.
+        candidates: Result of `make_fuzzy_candidates` for this slot, built from `keyword_map` and `options` when omitted.
     Returns:
         Canonical value string when a close match is found, otherwise `None`.
     """
@@ -264,22 +295,15 @@ def fuzzy_find_keyword(text: str, keyword_map, options, max_distance: int = 3):
     if not tokens:  # no tokens means nothing to match against
         return None
 
-    candidate_strings = options | set(keyword_map.keys())  # include canonical values and synonyms
+    if candidates is None:
+        candidates = make_fuzzy_candidates(keyword_map, options)
+
     best_value = None  # track the closest concrete value found so far
     best_distance = max_distance + 1  # store its edit distance for comparisons
     best_dc_value = None  # stash the best dontcare candidate separately
     best_dc_distance = max_distance + 1  # distance for that dontcare candidate
 
-    for candidate in candidate_strings:  # iterate over every potential target phrase
-        candidate_clean = clean_text(candidate)  # normalise the candidate for comparison
-        if not candidate_clean:  # skip empty strings after cleaning
-            continue
-
-        mapped_value = map_keyword_to_option(candidate_clean, keyword_map, options)  # resolve synonyms to canonical values
-        if mapped_value is None:  # ignore anything that doesn't map to an allowed option
-            continue
-
-        word_count = max(1, len(candidate_clean.split()))  # match n-gram length to candidate word count
+    for candidate_clean, mapped_value, word_count in candidates:  # iterate over every potential target phrase
         segments = [" ".join(tokens[i:i + word_count]) for i in range(len(tokens) - word_count + 1)]  # collect same-length segments from the text
         if not segments:  # if we lack segments of that size, move on
             continue
@@ -311,25 +335,33 @@ def fuzzy_find_keyword(text: str, keyword_map, options, max_distance: int = 3):
 
     return None  # nothing fell within the allowed edit distance
 
+# candidates for fuzzy matching, built once instead of on every extraction
+price_fuzzy_candidates = make_fuzzy_candidates(pricerange_keyword_map, pricerange_options)
+area_fuzzy_candidates = make_fuzzy_candidates(area_keyword_map, area_options)
+food_fuzzy_candidates = make_fuzzy_candidates(food_keyword_map, food_options)
+
 def extract_keywords(text: str):
     """Extract pricerange, area, and food preferences from free-form text.
 
+    Results are memoized per utterance, so repeated utterances skip the regex and fuzzy matching.
+
     Inputs:
         text: User utterance describing restaurant preferences.
     Returns:
         Dict with keys `pricerange`, `area`, and `food` mapped to detected values or `None`.
     """
+    # return a copy so callers can't modify the cached result
+    return dict(_extract_keywords_cached(text))
+
+@lru_cache(maxsize=2048)
+def _extract_keywords_cached(text: str):
+    """Cached implementation behind `extract_keywords`, see there for inputs and returns. Returns the shared cached dict, so only call it through `extract_keywords`."""
     original_text = text
     text = text.lower() # convert input to lowercase
     output = {"pricerange": None,
               "area": None,
               "food": None} # initialize an empty dict
 
-    #
-    price_patterns = make_regex_patterns(pricerange_options | set(pricerange_keyword_map.keys()))
-    area_patterns = make_regex_patterns(area_options | set(area_keyword_map.keys()))
-    food_patterns = make_regex_patterns(food_options | set(food_keyword_map.keys()))
-
     # get first match (with spans) so we can avoid overlapping slot assignments
     price_match, _ = first_match_with_span(price_patterns, text)
     food_match, food_span = first_match_with_span(food_patterns, text)
@@ -354,9 +386,9 @@ def extract_keywords(text: str):
     if food_span:
         mentions["area"] = bool(first_match(slot_mention_patterns["area"], clean_text(area_fuzzy_text)))
 
-    fuzzy_price = fuzzy_find_keyword(original_text, pricerange_keyword_map, pricerange_options)
-    fuzzy_area = fuzzy_find_keyword(area_fuzzy_text, area_keyword_map, area_options)
-    fuzzy_food = fuzzy_find_keyword(original_text, food_keyword_map, food_options)
+    fuzzy_price = fuzzy_find_keyword(original_text, pricerange_keyword_map, pricerange_options, candidates=price_fuzzy_candidates)
+    fuzzy_area = fuzzy_find_keyword(area_fuzzy_text, area_keyword_map, area_options, candidates=area_fuzzy_candidates)
+    fuzzy_food = fuzzy_find_keyword(original_text, food_keyword_map, food_options, candidates=food_fuzzy_candidates)
 
     if output["pricerange"] is None or (output["pricerange"] == "dontcare" and fuzzy_price not in {None, "dontcare"}):
         output["pricerange"] = fuzzy_price if fuzzy_price is not None else output["pricerange"]
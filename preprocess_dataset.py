@@ -17,20 +17,13 @@ def load_data_to_df(path: Union[Path, str]) -> pd.DataFrame:
         DataFrame with columns `label` and `text` containing cleaned rows.
     """
     data_path = Path(path)
-    rows: List[Tuple[str, str]] = []
-
-    with data_path.open("r", encoding="utf-8") as fh:
-        for raw_line in fh:
-            line = raw_line.strip()
-            if not line:
-                continue
-
-            pieces = line.split(maxsplit=1)
-            if len(pieces) != 2:
-                # Skip malformed rows to avoid downstream errors.
-                continue
-            label, text = pieces
-            rows.append((label, text))
+
+    # Read and decode the whole file in one go instead of line by line.
+    lines = data_path.read_bytes().decode("utf-8").split("\n")
+    pieces = [raw_line.strip().split(maxsplit=1) for raw_line in lines]
+
+    # Skip empty and malformed rows to avoid downstream errors.
+    rows: List[List[str]] = [piece for piece in pieces if len(piece) == 2]
 
     return pd.DataFrame(rows, columns=["label", "text"])
 